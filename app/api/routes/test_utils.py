@@ -21,6 +21,7 @@ from datetime import UTC, datetime
 
 import httpx
 from fastapi import APIRouter, HTTPException, Query, status
+from httpx import AsyncClient
 
 from app.core.config import settings
 
@@ -106,7 +107,7 @@ async def generate_test_token() -> dict:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with AsyncClient(timeout=10.0) as client:
             response = await client.post(token_url, json=payload)
             response.raise_for_status()
             token_data = response.json()
@@ -309,7 +310,7 @@ async def generate_test_user_token(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with AsyncClient(timeout=10.0) as client:
             response = await client.post(token_url, json=payload)
             response.raise_for_status()
             token_data = response.json()
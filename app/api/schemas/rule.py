@@ -5,7 +5,7 @@ from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-from app.core.validators import validate_condition_tree_depth, validate_condition_tree_node_count
+from app.core.validators import validate_condition_tree_limits
 from app.domain.enums import RuleAction, RuleType
 
 
@@ -20,15 +20,9 @@ def _validate_condition_tree(v: dict[str, Any] | None) -> dict[str, Any] | None:
     if not v:
         raise ValueError("condition_tree cannot be empty")
 
-    # Validate tree depth (max 10 levels)
+    # Validate tree depth (max 10 levels) and node count (max 1000 nodes to prevent DoS)
     try:
-        validate_condition_tree_depth(v, max_depth=10)
-    except ValueError as e:
-        raise ValueError(str(e)) from e
-
-    # Validate node count (max 1000 nodes to prevent DoS)
-    try:
-        validate_condition_tree_node_count(v, max_nodes=1000)
+        validate_condition_tree_limits(v, max_depth=10, max_nodes=1000)
     except ValueError as e:
         raise ValueError(str(e)) from e
 
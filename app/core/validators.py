@@ -1,16 +1,20 @@
 """Shared validators for Pydantic schemas."""
 
 import re
+import sys
 from typing import Any
 
 from pydantic import field_validator, model_validator
 
 # UUID v7 format pattern (simplified - validates UUID format in general)
 UUID_PATTERN = re.compile(
-    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
     re.IGNORECASE,
 )
 
+# Node types whose "conditions" hold child nodes
+_LOGICAL_TYPES = frozenset(("LOGICAL", "AND", "OR", "NOT"))
+
 
 def validate_uuid(value: str, field_name: str = "UUID") -> str:
     """
@@ -29,7 +33,8 @@ def validate_uuid(value: str, field_name: str = "UUID") -> str:
     if not isinstance(value, str):
         raise ValueError(f"{field_name} must be a string")
 
-    if not UUID_PATTERN.match(value):
+    # fullmatch, unlike match with "$", rejects a trailing newline
+    if not UUID_PATTERN.fullmatch(value):
         raise ValueError(
             f"{field_name} must be a valid UUID format (e.g., '01912345-1234-1234-1234-123456789abc')"
         )
@@ -37,6 +42,59 @@ def validate_uuid(value: str, field_name: str = "UUID") -> str:
     return value
 
 
+def validate_condition_tree_limits(
+    condition: dict, max_depth: int = 10, max_nodes: int = 1000, current_depth: int = 0
+) -> None:
+    """
+    Validate condition tree depth and node count in a single traversal.
+
+    Walks the tree with an explicit stack, so pathological trees cannot hit
+    Python's recursion limit. Nodes are counted as they are queued and the
+    walk stops as soon as the count passes ``max_nodes``, so an oversized
+    payload costs O(max_nodes) rather than O(input); the error then reports a
+    lower bound ("got N+ nodes").
+
+    Args:
+        condition: Condition tree dictionary
+        max_depth: Maximum allowed depth (default: 10)
+        max_nodes: Maximum allowed nodes (default: 1000)
+        current_depth: Depth of ``condition`` itself (default: 0)
+
+    Raises:
+        ValueError: If tree exceeds maximum depth or maximum node count
+    """
+    node_count = 1
+    # Each stack entry is a sibling iterator paused mid-walk, so the stack holds
+    # one entry per open logical node rather than one (child, depth) pair per
+    # queued child. Children are walked in reverse so the visit order matches
+    # popping them one at a time.
+    stack = [(iter((condition,)), current_depth)]
+    while stack:
+        nodes, depth = stack.pop()
+        for node in nodes:
+            if depth > max_depth:
+                raise ValueError(f"Condition tree exceeds maximum depth of {max_depth}")
+
+            # Logical operators come in both formats: "type": "LOGICAL" and "type": "AND"/"OR"/"NOT".
+            # Non-string types (possibly unhashable) are treated as leaves.
+            node_type = node.get("type")
+            if not isinstance(node_type, str) or node_type not in _LOGICAL_TYPES:
+                continue
+
+            children = node.get("conditions")
+            if children:
+                node_count += len(children)
+                if node_count > max_nodes:
+                    raise ValueError(
+                        f"Condition tree exceeds maximum node count of {max_nodes} "
+                        f"(got {node_count}+ nodes)"
+                    )
+                # Resume the remaining siblings after this subtree is done
+                stack.append((nodes, depth))
+                stack.append((reversed(children), depth + 1))
+                break
+
+
 def validate_condition_tree_depth(
     condition: dict, max_depth: int = 10, current_depth: int = 0
 ) -> None:
@@ -46,28 +104,14 @@ def validate_condition_tree_depth(
     Args:
         condition: Condition tree dictionary
         max_depth: Maximum allowed depth (default: 10)
-        current_depth: Current depth in recursion
+        current_depth: Depth of ``condition`` itself (default: 0)
 
     Raises:
         ValueError: If tree exceeds maximum depth
     """
-    if current_depth > max_depth:
-        raise ValueError(f"Condition tree exceeds maximum depth of {max_depth}")
-
-    # Check for logical operators (both formats: "type": "LOGICAL" and "type": "AND"/"OR")
-    node_type = condition.get("type", "")
-    if node_type in ("LOGICAL", "AND", "OR", "NOT"):
-        # Recursively validate nested conditions
-        children = condition.get("conditions", [])
-        if node_type == "LOGICAL":
-            # For "LOGICAL" type format
-            children = condition.get("conditions", [])
-        else:
-            # For "AND"/"OR"/"NOT" type format
-            children = condition.get("conditions", [])
-
-        for child in children:
-            validate_condition_tree_depth(child, max_depth, current_depth + 1)
+    validate_condition_tree_limits(
+        condition, max_depth=max_depth, max_nodes=sys.maxsize, current_depth=current_depth
+    )
 
 
 def validate_condition_tree_node_count(condition: dict, max_nodes: int = 1000) -> None:
@@ -84,27 +128,7 @@ def validate_condition_tree_node_count(condition: dict, max_nodes: int = 1000) -
     Raises:
         ValueError: If tree exceeds maximum node count
     """
-
-    def count_nodes(node: dict) -> int:
-        """Recursively count all nodes in the condition tree."""
-        # Count current node
-        count = 1
-
-        # If it's a logical node, count all children
-        # Support both "LOGICAL" type and "AND"/"OR"/"NOT" types
-        node_type = node.get("type", "")
-        if node_type in ("LOGICAL", "AND", "OR", "NOT"):
-            for child in node.get("conditions", []):
-                count += count_nodes(child)
-
-        return count
-
-    node_count = count_nodes(condition)
-
-    if node_count > max_nodes:
-        raise ValueError(
-            f"Condition tree exceeds maximum node count of {max_nodes} (got {node_count} nodes)"
-        )
+    validate_condition_tree_limits(condition, max_depth=sys.maxsize, max_nodes=max_nodes)
 
 
 class ConditionTreeValidator:
@@ -132,15 +156,9 @@ class ConditionTreeValidator:
         if not v:
             raise ValueError("condition_tree cannot be empty")
 
-        # Validate depth (supports both LOGICAL and AND/OR/NOT formats)
-        try:
-            validate_condition_tree_depth(v, max_depth=10)
-        except ValueError as e:
-            raise ValueError(str(e)) from e
-
-        # Validate node count (supports both LOGICAL and AND/OR/NOT formats)
+        # Validate depth and node count (supports both LOGICAL and AND/OR/NOT formats)
         try:
-            validate_condition_tree_node_count(v, max_nodes=1000)
+            validate_condition_tree_limits(v, max_depth=10, max_nodes=1000)
         except ValueError as e:
             raise ValueError(str(e)) from e
 
@@ -7,6 +7,8 @@ from typing import Any
 
 JsonType = dict[str, "JsonType"] | list["JsonType"] | str | int | float | bool | None
 
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
 
 def validate_uuid_string(_key: str, value: uuid.UUID | str) -> str:
     """Convert UUID to string and validate format.
@@ -24,11 +26,20 @@ def validate_uuid_string(_key: str, value: uuid.UUID | str) -> str:
     Raises:
         ValueError: If the value is not a valid UUID format
     """
+    if not isinstance(value, (str, uuid.UUID)):
+        raise ValueError(f"Expected UUID or str, got {type(value).__name__}")
+
     if isinstance(value, uuid.UUID):
         return str(value)
 
-    if not isinstance(value, str):
-        raise ValueError(f"Expected UUID or str, got {type(value).__name__}")
+    # Fast path for the canonical 8-4-4-4-12 form (every generated ID): accept it
+    # without building a uuid.UUID. Any other hyphen is left behind and fails.
+    if (
+        len(value) == 36
+        and value[8] == value[13] == value[18] == value[23] == "-"
+        and _HEX_DIGITS.issuperset(value.replace("-", "", 4))
+    ):
+        return value
 
     try:
         uuid.UUID(value)
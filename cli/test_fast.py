@@ -0,0 +1,25 @@
+"""CLI wrapper: Run the fast unit-test lane (no coverage) with Doppler."""
+
+from __future__ import annotations
+
+import sys
+
+from cli._runner import run
+
+
+def main() -> None:
+    run(
+        [
+            "doppler",
+            "run",
+            "--",
+            "python",
+            "-m",
+            "pytest",
+            "-m",
+            "fast",
+            "--no-cov",
+            "-q",
+            *sys.argv[1:],
+        ]
+    )
@@ -32,6 +32,7 @@ from collections.abc import AsyncGenerator, Generator
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
+from unittest.mock import AsyncMock, MagicMock
 from urllib.parse import urlparse
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -50,6 +51,7 @@ if _explicit_env_file:
 
 import httpx  # noqa: E402 (import after path setup)
 import pytest  # noqa: E402 (import after path setup)
+from fastapi import FastAPI  # noqa: E402 (import after path setup)
 from fastapi.testclient import TestClient  # noqa: E402 (import after path setup)
 from sqlalchemy import create_engine, text  # noqa: E402 (import after path setup)
 from sqlalchemy.engine import Engine  # noqa: E402 (import after path setup)
@@ -282,7 +284,9 @@ def _assert_schema_current(engine: Engine) -> None:
 # Per AnyIO testing docs: https://anyio.readthedocs.io/en/stable/testing.html
 # This fixture ensures async fixtures work with AnyIO's pytest plugin.
 # pytest-asyncio is in strict mode (no asyncio_mode = "auto") to avoid conflicts.
-@pytest.fixture
+# Session scope lets AnyIO keep one event loop for the whole run instead of
+# building and tearing one down per test.
+@pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
 
@@ -661,36 +665,65 @@ def create_mock_token(sub: str = "test-user", roles: list[str] | None = None) ->
     return claims
 
 
-@pytest.fixture
+# Role payloads are pure functions of their role, so they are built once per
+# session. Nothing in the app mutates the current-user dict.
+@pytest.fixture(scope="session")
 def mock_user() -> dict[str, Any]:
     """Mock authenticated user with no specific roles."""
     return create_mock_token(sub="user-123", roles=[])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_admin() -> dict[str, Any]:
     """Mock authenticated user with PLATFORM_ADMIN role."""
     return create_mock_token(sub="admin-123", roles=["PLATFORM_ADMIN"])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_maker() -> dict[str, Any]:
     """Mock authenticated user with RULE_MAKER role."""
     return create_mock_token(sub="maker-123", roles=["RULE_MAKER"])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_checker() -> dict[str, Any]:
     """Mock authenticated user with RULE_CHECKER role."""
     return create_mock_token(sub="checker-123", roles=["RULE_CHECKER"])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_maker_checker() -> dict[str, Any]:
     """Mock authenticated user with both RULE_MAKER and RULE_CHECKER roles."""
     return create_mock_token(sub="maker-checker-123", roles=["RULE_MAKER", "RULE_CHECKER"])
 
 
+# ============================================================================
+# Auth0 HTTP Client Mocks
+# ============================================================================
+
+
+@pytest.fixture
+def mock_auth0_client(monkeypatch: pytest.MonkeyPatch) -> tuple[MagicMock, MagicMock]:
+    """
+    Replace the AsyncClient name imported by the test-token routes with a mock.
+
+    Only the route module's binding is patched, so httpx.AsyncClient itself (and
+    any ASGI test client a test builds) is unaffected regardless of fixture order.
+
+    Returns:
+        Tuple of (class_mock, instance_mock). Configure the Auth0 response via
+        ``instance_mock.post.return_value`` or ``instance_mock.post.side_effect``.
+    """
+    class_mock = MagicMock()
+    instance_mock = MagicMock()
+    instance_mock.__aenter__ = AsyncMock(return_value=instance_mock)
+    instance_mock.__aexit__ = AsyncMock(return_value=False)
+    instance_mock.post = AsyncMock()
+    class_mock.return_value = instance_mock
+    monkeypatch.setattr("app.api.routes.test_utils.AsyncClient", class_mock)
+    return class_mock, instance_mock
+
+
 # ============================================================================
 # FastAPI TestClient Fixtures
 # ============================================================================
@@ -787,51 +820,119 @@ async def authenticated_client(async_db_session: AsyncSession, mock_user: dict):
         yield c
 
 
-@pytest.fixture
-async def admin_client(async_db_session: AsyncSession, mock_admin: dict):
-    """AsyncClient with ADMIN role."""
-    import httpx
-
+def _bind_app_overrides(
+    app: FastAPI, async_db_session: AsyncSession, mock_user: dict[str, Any]
+) -> None:
+    """Point a shared app at this test's DB session and authenticated user."""
     from app.core.dependencies import get_async_db_session
 
-    app = create_app()
-
     def override_get_async_db():
         yield async_db_session
 
-    app.dependency_overrides[get_async_db_session] = override_get_async_db
-
     async def override_get_current_user():
-        return mock_admin
+        return mock_user
 
+    app.dependency_overrides[get_async_db_session] = override_get_async_db
     app.dependency_overrides[get_current_user] = override_get_current_user
 
-    transport = httpx.ASGITransport(app=app)
-    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+
+@pytest.fixture(scope="session")
+def admin_app() -> FastAPI:
+    """App shared by admin_client across the session (create_app() runs once)."""
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+def maker_app() -> FastAPI:
+    """App shared by maker_client across the session (create_app() runs once)."""
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+async def admin_http(admin_app: FastAPI) -> AsyncGenerator[httpx.AsyncClient]:
+    """AsyncClient on admin_app, opened once per session."""
+    transport = httpx.ASGITransport(app=admin_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=10.0) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+async def maker_http(maker_app: FastAPI) -> AsyncGenerator[httpx.AsyncClient]:
+    """AsyncClient on maker_app, opened once per session."""
+    transport = httpx.ASGITransport(app=maker_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=10.0) as c:
         yield c
 
 
 @pytest.fixture
-async def maker_client(async_db_session: AsyncSession, mock_maker: dict):
-    """AsyncClient with MAKER role."""
-    import httpx
+async def admin_client(
+    admin_app: FastAPI,
+    admin_http: httpx.AsyncClient,
+    async_db_session: AsyncSession,
+    mock_admin: dict,
+):
+    """AsyncClient with ADMIN role.
+
+    The app and client are session-scoped; the DB session is still per-test
+    and rolled back afterwards, so shared state never carries data between tests.
+    """
+    _bind_app_overrides(admin_app, async_db_session, mock_admin)
+    try:
+        yield admin_http
+    finally:
+        admin_app.dependency_overrides.clear()
+        admin_http.cookies.clear()
 
-    from app.core.dependencies import get_async_db_session
 
-    app = create_app()
+@pytest.fixture
+async def maker_client(
+    maker_app: FastAPI,
+    maker_http: httpx.AsyncClient,
+    async_db_session: AsyncSession,
+    mock_maker: dict,
+):
+    """AsyncClient with MAKER role (session-scoped app and client, per-test DB session)."""
+    _bind_app_overrides(maker_app, async_db_session, mock_maker)
+    try:
+        yield maker_http
+    finally:
+        maker_app.dependency_overrides.clear()
+        maker_http.cookies.clear()
 
-    def override_get_async_db():
-        yield async_db_session
 
-    app.dependency_overrides[get_async_db_session] = override_get_async_db
+@pytest.fixture(scope="session")
+def no_db_app(mock_admin: dict) -> FastAPI:
+    """
+    App with ADMIN role and no database behind it.
+
+    Kept separate from admin_app so its overrides never mix with a per-test DB
+    session. Nothing here varies per test, so the overrides are bound once.
+    """
+    from app.core.dependencies import get_async_db_session
+
+    def override_get_async_db():
+        yield None
 
     async def override_get_current_user():
-        return mock_maker
+        return mock_admin
 
+    app = create_app()
+    app.dependency_overrides[get_async_db_session] = override_get_async_db
     app.dependency_overrides[get_current_user] = override_get_current_user
+    return app
 
-    transport = httpx.ASGITransport(app=app)
-    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+
+@pytest.fixture(scope="session")
+async def no_db_client(no_db_app: FastAPI) -> AsyncGenerator[httpx.AsyncClient]:
+    """
+    AsyncClient on no_db_app, opened once per session.
+
+    For tests that only exercise routing or request parsing (e.g. unmatched
+    paths, undecodable bodies). The DB dependency yields None, so no engine or
+    transaction is set up.
+    """
+    transport = httpx.ASGITransport(app=no_db_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=10.0) as c:
         yield c
 
 
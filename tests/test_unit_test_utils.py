@@ -4,596 +4,362 @@ Tests the /test-token endpoint which generates real Auth0 tokens for local devel
 Coverage targets: 80%+ for app/api/routes/test_utils.py
 """
 
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from types import SimpleNamespace
+from unittest.mock import Mock
 
 import httpx
 import pytest
-from fastapi.testclient import TestClient
 
+from app.main import create_app
+
+# Longer than the 20-character log preview, so the endpoint logs "<prefix>...".
+_LONG_JWT = ("eyJhbGciOiJSUzI1NiIsInR5cCI6IkpXVCJ9." * 10) + "signature"
+# At most 20 characters, so the endpoint logs "***".
+_SHORT_TOKEN = "short.token.here"
+# Shared placeholder for the request argument of httpx exceptions.
+_DUMMY_REQUEST = Mock(spec=httpx.Request)
+
+# Stand-ins for the attributes /test-token reads from settings.
+_LOCAL_SETTINGS = SimpleNamespace(
+    app_env="local",
+    auth0_client_id="test-client-id",
+    auth0_client_secret="test-client-secret",
+    auth0_domain="test.auth0.com",
+    auth0_audience="https://test-api",
+)
+_PROD_SETTINGS = SimpleNamespace(
+    app_env="prod",
+    auth0_client_id=None,
+    auth0_client_secret=None,
+    auth0_domain="test.auth0.com",
+    auth0_audience="https://test-api",
+)
+
+
+@pytest.fixture
+def local_env(monkeypatch):
+    """Point the test-utils route at local settings with Auth0 configured."""
+    monkeypatch.setattr("app.api.routes.test_utils.settings", _LOCAL_SETTINGS)
+    return _LOCAL_SETTINGS
+
+
+@pytest.fixture
+def success_response():
+    """Factory for a successful Auth0 token response mock."""
+
+    def _make(access_token="tok", token_type="Bearer", expires_in=3600, omit=()):
+        body = {"access_token": access_token, "token_type": token_type, "expires_in": expires_in}
+        for key in omit:
+            del body[key]
+        response = Mock()
+        response.configure_mock(
+            **{"status_code": 200, "json.return_value": body, "raise_for_status.return_value": None}
+        )
+        return response
+
+    return _make
+
+
+@pytest.fixture(scope="module")
+def app():
+    """Build the app once per module with the test-utils router mounted."""
+    import app.api.routes.test_utils as test_utils_module
+
+    # create_app() only mounts the test-utils router outside prod.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(test_utils_module.settings, "app_env", "local")
+        return create_app()
 
+
+@pytest.fixture
+async def aclient(app):
+    """AsyncClient bound to the module app via in-process ASGI transport."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.mark.unit
+@pytest.mark.fast
 class TestGenerateTestToken:
     """Test suite for generate_test_token endpoint."""
 
     @pytest.mark.anyio
-    async def test_returns_403_in_production_environment(self):
+    async def test_returns_403_in_production_environment(self, aclient, monkeypatch):
         """Test that production environment returns 403 Forbidden."""
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "prod"
-
-            from app.main import create_app
-
-            app = create_app()
-            client = TestClient(app)
+        monkeypatch.setattr("app.api.routes.test_utils.settings", _PROD_SETTINGS)
 
-            response = client.get("/api/v1/test-token")
+        response = await aclient.get("/api/v1/test-token")
 
-            assert response.status_code == 403
-            data = response.json()
-            # HTTPException handler wraps detail in "message" field
-            assert "not available in production" in data.get("message", str(data.get("detail", "")))
+        assert response.status_code == 403
+        assert "not available in production" in response.text
 
     @pytest.mark.anyio
-    async def test_returns_500_when_auth0_credentials_not_configured(self):
+    async def test_returns_500_when_auth0_credentials_not_configured(
+        self, aclient, monkeypatch, local_env
+    ):
         """Test that missing Auth0 credentials returns 500 Internal Server Error."""
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = None
-            mock_settings.auth0_client_secret = None
+        monkeypatch.setattr(local_env, "auth0_client_id", None)
+        monkeypatch.setattr(local_env, "auth0_client_secret", None)
 
-            from app.main import create_app
+        response = await aclient.get("/api/v1/test-token")
 
-            app = create_app()
-            client = TestClient(app)
-
-            response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 500
-            data = response.json()
-            # When detail is a dict, it gets wrapped in message
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Test endpoint not configured"
-                assert "Contact administrator" in data["message"]["message"]
-            else:
-                # Fallback for different error format
-                assert "Test endpoint not configured" in str(data)
+        assert response.status_code == 500
+        body = response.text
+        assert "Test endpoint not configured" in body
+        assert "Contact administrator" in body
 
     @pytest.mark.anyio
-    async def test_returns_500_when_client_id_missing_only(self):
+    async def test_returns_500_when_client_id_missing_only(self, aclient, monkeypatch, local_env):
         """Test that missing client_id (with secret set) returns 500."""
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = None
-            mock_settings.auth0_client_secret = "test-secret"
-
-            from app.main import create_app
+        monkeypatch.setattr(local_env, "auth0_client_id", None)
+        monkeypatch.setattr(local_env, "auth0_client_secret", "test-secret")
 
-            app = create_app()
-            client = TestClient(app)
+        response = await aclient.get("/api/v1/test-token")
 
-            response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 500
-            data = response.json()
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Test endpoint not configured"
-            else:
-                assert "Test endpoint not configured" in str(data)
+        assert response.status_code == 500
+        assert "Test endpoint not configured" in response.text
 
     @pytest.mark.anyio
-    async def test_returns_500_when_client_secret_missing_only(self):
+    async def test_returns_500_when_client_secret_missing_only(
+        self, aclient, monkeypatch, local_env
+    ):
         """Test that missing client_secret (with client_id set) returns 500."""
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = None
-
-            from app.main import create_app
+        monkeypatch.setattr(local_env, "auth0_client_secret", None)
 
-            app = create_app()
-            client = TestClient(app)
+        response = await aclient.get("/api/v1/test-token")
 
-            response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 500
-            data = response.json()
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Test endpoint not configured"
-            else:
-                assert "Test endpoint not configured" in str(data)
+        assert response.status_code == 500
+        assert "Test endpoint not configured" in response.text
 
     @pytest.mark.anyio
-    async def test_returns_500_when_credentials_empty_strings(self):
+    async def test_returns_500_when_credentials_empty_strings(
+        self, aclient, monkeypatch, local_env
+    ):
         """Test that empty string credentials are treated as missing."""
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = ""
-            mock_settings.auth0_client_secret = ""
-
-            from app.main import create_app
-
-            app = create_app()
-            client = TestClient(app)
+        monkeypatch.setattr(local_env, "auth0_client_id", "")
+        monkeypatch.setattr(local_env, "auth0_client_secret", "")
 
-            response = client.get("/api/v1/test-token")
+        response = await aclient.get("/api/v1/test-token")
 
-            assert response.status_code == 500
-            data = response.json()
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Test endpoint not configured"
-            else:
-                assert "Test endpoint not configured" in str(data)
+        assert response.status_code == 500
+        assert "Test endpoint not configured" in response.text
 
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
     @pytest.mark.anyio
-    async def test_returns_token_successfully_when_configured(self, mock_httpx_client_class):
-        """Test successful token generation with valid credentials."""
-        # Mock Auth0 response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "access_token": "eyJhbGciOiJSUzI1NiIsInR5cCI6IkpXVCJ9.test-token",
-            "token_type": "Bearer",
-            "expires_in": 3600,
+    async def test_auth0_request_contract(
+        self, aclient, mock_auth0_client, success_response, local_env
+    ):
+        """Test the token response shape and the single request made to Auth0."""
+        mock_httpx_client_class, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = success_response(
+            access_token="eyJhbGciOiJSUzI1NiIsInR5cCI6IkpXVCJ9.test-token"
+        )
+
+        response = await aclient.get("/api/v1/test-token")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "access_token" in data
+        assert data["token_type"] == "Bearer"
+        assert data["expires_in"] == 3600
+        assert "issued_at" in data
+        assert "swagger_ui" in data["usage"]
+        assert "curl_example" in data["usage"]
+
+        # httpx.AsyncClient is built once, with a 10s timeout
+        mock_httpx_client_class.assert_called_once_with(timeout=10.0)
+
+        # One client-credentials POST to the tenant's token endpoint
+        mock_client_instance.post.assert_called_once()
+        (url,), kwargs = mock_client_instance.post.call_args
+        assert url == "https://test.auth0.com/oauth/token"
+        assert kwargs["json"] == {
+            "client_id": "test-client-id",
+            "client_secret": "test-client-secret",
+            "audience": "https://test-api",
+            "grant_type": "client_credentials",
         }
-        mock_response.raise_for_status = Mock()
-
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
-
-        mock_httpx_client_class.return_value = mock_client_instance
-
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
-            mock_settings.auth0_user_audience_resolved = "https://portal.example.com"
-
-            from app.main import create_app
-
-            app = create_app()
-            client = TestClient(app)
-
-            response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "access_token" in data
-            assert data["token_type"] == "Bearer"
-            assert data["expires_in"] == 3600
-            assert "issued_at" in data
-            assert "usage" in data
-            assert "swagger_ui" in data["usage"]
-            assert "curl_example" in data["usage"]
-
-            # Verify httpx.AsyncClient was called with timeout
-            mock_httpx_client_class.assert_called_once_with(timeout=10.0)
-
-            # Verify the POST request was made to correct URL
-            mock_client_instance.post.assert_called_once()
-            call_args = mock_client_instance.post.call_args
-            assert "test.auth0.com" in call_args[0][0]
-            assert "/oauth/token" in call_args[0][0]
-            assert call_args.kwargs["json"]["audience"] == "https://test-api"
-
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
+
     @pytest.mark.anyio
-    async def test_handles_http_status_error_from_auth0(self, mock_httpx_client_class):
+    async def test_handles_http_status_error_from_auth0(
+        self, aclient, mock_auth0_client, monkeypatch, local_env
+    ):
         """Test handling of HTTPStatusError when Auth0 request fails."""
         # Mock Auth0 error response
         mock_response = Mock()
         mock_response.status_code = 401
         mock_error = httpx.HTTPStatusError(
-            "Invalid credentials", request=Mock(), response=mock_response
+            "Invalid credentials", request=_DUMMY_REQUEST, response=mock_response
         )
-        mock_response.raise_for_status = Mock(side_effect=mock_error)
-
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
-
-        mock_httpx_client_class.return_value = mock_client_instance
-
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "bad-client-id"
-            mock_settings.auth0_client_secret = "bad-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
-            mock_settings.auth0_user_audience_resolved = "https://portal.example.com"
+        mock_response.raise_for_status.side_effect = mock_error
 
-            from app.main import create_app
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = mock_response
 
-            app = create_app()
-            client = TestClient(app)
+        monkeypatch.setattr(local_env, "auth0_client_id", "bad-client-id")
+        monkeypatch.setattr(local_env, "auth0_client_secret", "bad-client-secret")
 
-            response = client.get("/api/v1/test-token")
+        response = await aclient.get("/api/v1/test-token")
 
-            assert response.status_code == 500
-            data = response.json()
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Authentication service unavailable"
-                assert "Auth0" in data["message"]["message"]
-            else:
-                assert "Authentication service unavailable" in str(data) or "Auth0" in str(data)
+        assert response.status_code == 500
+        body = response.text
+        assert "Authentication service unavailable" in body
+        assert "Auth0" in body
 
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
     @pytest.mark.anyio
-    async def test_handles_generic_exception_from_auth0(self, mock_httpx_client_class):
+    async def test_handles_generic_exception_from_auth0(
+        self, aclient, mock_auth0_client, local_env
+    ):
         """Test handling of generic exceptions during token generation."""
         # Mock a generic exception (e.g., network error)
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(side_effect=Exception("Network error"))
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.side_effect = Exception("Network error")
 
-        mock_httpx_client_class.return_value = mock_client_instance
+        response = await aclient.get("/api/v1/test-token")
 
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
-            mock_settings.auth0_user_audience_resolved = "https://portal.example.com"
+        assert response.status_code == 500
+        body = response.text
+        assert "Failed to get token from Auth0" in body
+        assert "Network error" in body
 
-            from app.main import create_app
-
-            app = create_app()
-            client = TestClient(app)
-
-            response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 500
-            data = response.json()
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Failed to get token from Auth0"
-                assert "Network error" in data["message"]["message"]
-            else:
-                assert "Failed to get token from Auth0" in str(data) or "Network error" in str(data)
-
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
     @pytest.mark.anyio
-    async def test_handles_timeout_exception(self, mock_httpx_client_class):
+    async def test_handles_timeout_exception(self, aclient, mock_auth0_client, local_env):
         """Test handling of timeout exceptions during Auth0 request."""
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(
-            side_effect=httpx.TimeoutException("Request timed out", request=Mock())
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.side_effect = httpx.TimeoutException(
+            "Request timed out", request=_DUMMY_REQUEST
         )
 
-        mock_httpx_client_class.return_value = mock_client_instance
-
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
+        response = await aclient.get("/api/v1/test-token")
 
-            from app.main import create_app
+        assert response.status_code == 500
+        assert "Failed to get token from Auth0" in response.text
 
-            app = create_app()
-            client = TestClient(app)
-
-            response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 500
-            data = response.json()
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Failed to get token from Auth0"
-            else:
-                assert (
-                    "Failed to get token from Auth0" in str(data)
-                    or "timed out" in str(data).lower()
-                )
-
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
     @pytest.mark.anyio
-    async def test_token_preview_logging_redacts_jwt(self, mock_httpx_client_class, caplog):
+    async def test_token_preview_logging_redacts_jwt(
+        self, aclient, mock_auth0_client, success_response, caplog, local_env
+    ):
         """Test that token preview in logs only shows first 20 characters."""
         # Mock Auth0 response with a long token
-        long_token = "eyJhbGciOiJSUzI1NiIsInR5cCI6IkpXVCJ9." * 10 + "signature"
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "access_token": long_token,
-            "token_type": "Bearer",
-            "expires_in": 3600,
-        }
-        mock_response.raise_for_status = Mock()
+        mock_response = success_response(access_token=_LONG_JWT)
 
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = mock_response
 
-        mock_httpx_client_class.return_value = mock_client_instance
+        with caplog.at_level("INFO", logger="app.api.routes.test_utils"):
+            response = await aclient.get("/api/v1/test-token")
 
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
+        assert response.status_code == 200
 
-            from app.main import create_app
-
-            app = create_app()
-            client = TestClient(app)
-
-            with caplog.at_level("INFO"):
-                response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 200
-
-            # Check that a log entry contains redacted token preview
-            log_messages = [record.message for record in caplog.records]
-            token_log = [msg for msg in log_messages if "Generated M2M test token" in msg]
-            assert len(token_log) > 0
-            # Verify token is redacted (only shows first 20 chars + ...)
-            assert "..." in token_log[0]
-            # Full token should NOT appear in logs
-            assert long_token not in token_log[0]
+        # Check that a log entry contains redacted token preview
+        token_log = next(
+            (r.message for r in caplog.records if "Generated M2M test token" in r.message), None
+        )
+        assert token_log is not None
+        # Verify token is redacted (only shows first 20 chars + ...)
+        assert "..." in token_log
+        # Full token should NOT appear in logs
+        assert _LONG_JWT not in token_log
 
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
     @pytest.mark.anyio
-    async def test_short_token_not_redacted_in_logs(self, mock_httpx_client_class, caplog):
+    async def test_short_token_not_redacted_in_logs(
+        self, aclient, mock_auth0_client, success_response, caplog, local_env
+    ):
         """Test that very short tokens are fully redacted in logs."""
         # Mock Auth0 response with a short token (< 20 chars)
-        short_token = "short.token.here"
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "access_token": short_token,
-            "token_type": "Bearer",
-            "expires_in": 3600,
-        }
-        mock_response.raise_for_status = Mock()
-
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
-
-        mock_httpx_client_class.return_value = mock_client_instance
-
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
-
-            from app.main import create_app
-
-            app = create_app()
-            client = TestClient(app)
-
-            with caplog.at_level("INFO"):
-                response = client.get("/api/v1/test-token")
-
-            assert response.status_code == 200
-
-            # Check that short tokens are redacted as "***"
-            log_messages = [record.message for record in caplog.records]
-            token_log = [msg for msg in log_messages if "Generated M2M test token" in msg]
-            assert len(token_log) > 0
-            assert "***" in token_log[0]
-            # Short token should NOT appear in logs
-            assert short_token not in token_log[0]
-
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
-    @pytest.mark.anyio
-    async def test_payload_sent_to_auth0(self, mock_httpx_client_class):
-        """Test that correct payload is sent to Auth0."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "access_token": "test-access-token",
-            "token_type": "Bearer",
-            "expires_in": 7200,
-        }
-        mock_response.raise_for_status = Mock()
-
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
-
-        mock_httpx_client_class.return_value = mock_client_instance
-
-        client_id = "my-test-client"
-        client_secret = "my-test-secret"
-        audience = "https://my-api"
-        domain = "mydomain.auth0.com"
-
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = client_id
-            mock_settings.auth0_client_secret = client_secret
-            mock_settings.auth0_domain = domain
-            mock_settings.auth0_audience = audience
-
-            from app.main import create_app
-
-            app = create_app()
-            client = TestClient(app)
+        mock_response = success_response(access_token=_SHORT_TOKEN)
 
-            response = client.get("/api/v1/test-token")
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = mock_response
 
-            assert response.status_code == 200
+        with caplog.at_level("INFO", logger="app.api.routes.test_utils"):
+            response = await aclient.get("/api/v1/test-token")
 
-            # Verify the POST request payload
-            call_args = mock_client_instance.post.call_args
-            payload = call_args[1]["json"]  # keyword argument 'json'
+        assert response.status_code == 200
 
-            assert payload["client_id"] == client_id
-            assert payload["client_secret"] == client_secret
-            assert payload["audience"] == audience
-            assert payload["grant_type"] == "client_credentials"
+        # Check that short tokens are redacted as "***"
+        token_log = next(
+            (r.message for r in caplog.records if "Generated M2M test token" in r.message), None
+        )
+        assert token_log is not None
+        assert "***" in token_log
+        # Short token should NOT appear in logs
+        assert _SHORT_TOKEN not in token_log
 
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
     @pytest.mark.anyio
-    async def test_returns_default_values_when_auth0_omits_fields(self, mock_httpx_client_class):
+    async def test_returns_default_values_when_auth0_omits_fields(
+        self, aclient, mock_auth0_client, success_response, local_env
+    ):
         """Test handling of Auth0 response with missing optional fields."""
         # Mock Auth0 response with only required fields
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "access_token": "minimal-token",
-            # token_type and expires_in are missing
-        }
-        mock_response.raise_for_status = Mock()
+        mock_response = success_response(
+            access_token="minimal-token", omit=("token_type", "expires_in")
+        )
+
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = mock_response
 
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
+        response = await aclient.get("/api/v1/test-token")
 
-        mock_httpx_client_class.return_value = mock_client_instance
+        assert response.status_code == 200
+        data = response.json()
+        assert data["access_token"] == "minimal-token"
+        # Should use defaults from .get() calls
+        assert data["token_type"] == "Bearer"
+        assert data["expires_in"] == 86400
+        assert "issued_at" in data
 
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
+    @pytest.mark.anyio
+    async def test_works_in_test_environment(
+        self, aclient, mock_auth0_client, success_response, monkeypatch, local_env
+    ):
+        """Test that endpoint works in test environment (not just local)."""
+        mock_response = success_response(access_token="test-token")
 
-            from app.main import create_app
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = mock_response
 
-            app = create_app()
-            client = TestClient(app)
+        monkeypatch.setattr(local_env, "app_env", "test")
 
-            response = client.get("/api/v1/test-token")
+        response = await aclient.get("/api/v1/test-token")
 
-            assert response.status_code == 200
-            data = response.json()
-            assert data["access_token"] == "minimal-token"
-            # Should use defaults from .get() calls
-            assert data["token_type"] == "Bearer"
-            assert data["expires_in"] == 86400
-            assert "issued_at" in data
+        # Should not be 403 (forbidden in production)
+        assert response.status_code != 403
+        assert response.status_code == 200
 
     @pytest.mark.anyio
-    async def test_works_in_test_environment(self):
-        """Test that endpoint works in test environment (not just local)."""
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "test"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
-
-            # Should not raise 403 in test environment
-            # It will fail with 500 because we're not mocking httpx, but we're
-            # just checking it doesn't return 403
-            with patch("app.api.routes.test_utils.httpx.AsyncClient") as mock_httpx_client_class:
-                mock_response = Mock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {
-                    "access_token": "test-token",
-                    "token_type": "Bearer",
-                    "expires_in": 3600,
-                }
-                mock_response.raise_for_status = Mock()
-
-                mock_client_instance = MagicMock()
-                mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-                mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-                mock_client_instance.post = AsyncMock(return_value=mock_response)
-
-                mock_httpx_client_class.return_value = mock_client_instance
-
-                from app.main import create_app
-
-                app = create_app()
-                client = TestClient(app)
-
-                response = client.get("/api/v1/test-token")
-
-                # Should not be 403 (forbidden in production)
-                assert response.status_code != 403
-                assert response.status_code == 200
-
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
-    @pytest.mark.anyio
-    async def test_auth0_403_error_handling(self, mock_httpx_client_class):
+    async def test_auth0_403_error_handling(self, aclient, mock_auth0_client, local_env):
         """Test handling of Auth0 403 Forbidden errors."""
         mock_response = Mock()
         mock_response.status_code = 403
-        mock_error = httpx.HTTPStatusError("Forbidden", request=Mock(), response=mock_response)
-        mock_response.raise_for_status = Mock(side_effect=mock_error)
-
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
-
-        mock_httpx_client_class.return_value = mock_client_instance
-
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
-
-            from app.main import create_app
+        mock_error = httpx.HTTPStatusError(
+            "Forbidden", request=_DUMMY_REQUEST, response=mock_response
+        )
+        mock_response.raise_for_status.side_effect = mock_error
 
-            app = create_app()
-            client = TestClient(app)
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = mock_response
 
-            response = client.get("/api/v1/test-token")
+        response = await aclient.get("/api/v1/test-token")
 
-            assert response.status_code == 500
-            data = response.json()
-            # Should not leak Auth0 error details
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Authentication service unavailable"
-            else:
-                assert "Authentication service unavailable" in str(data)
+        assert response.status_code == 500
+        # Should not leak Auth0 error details
+        assert "Authentication service unavailable" in response.text
 
-    @patch("app.api.routes.test_utils.httpx.AsyncClient")
     @pytest.mark.anyio
-    async def test_auth0_500_error_handling(self, mock_httpx_client_class):
+    async def test_auth0_500_error_handling(self, aclient, mock_auth0_client, local_env):
         """Test handling of Auth0 500 Internal Server errors."""
         mock_response = Mock()
         mock_response.status_code = 500
         mock_error = httpx.HTTPStatusError(
-            "Internal Server Error", request=Mock(), response=mock_response
+            "Internal Server Error", request=_DUMMY_REQUEST, response=mock_response
         )
-        mock_response.raise_for_status = Mock(side_effect=mock_error)
-
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_instance.post = AsyncMock(return_value=mock_response)
-
-        mock_httpx_client_class.return_value = mock_client_instance
-
-        with patch("app.api.routes.test_utils.settings") as mock_settings:
-            mock_settings.app_env = "local"
-            mock_settings.auth0_client_id = "test-client-id"
-            mock_settings.auth0_client_secret = "test-client-secret"
-            mock_settings.auth0_domain = "test.auth0.com"
-            mock_settings.auth0_audience = "https://test-api"
-
-            from app.main import create_app
+        mock_response.raise_for_status.side_effect = mock_error
 
-            app = create_app()
-            client = TestClient(app)
+        _, mock_client_instance = mock_auth0_client
+        mock_client_instance.post.return_value = mock_response
 
-            response = client.get("/api/v1/test-token")
+        response = await aclient.get("/api/v1/test-token")
 
-            assert response.status_code == 500
-            data = response.json()
-            if "message" in data and isinstance(data["message"], dict):
-                assert data["message"]["error"] == "Authentication service unavailable"
-            else:
-                assert "Authentication service unavailable" in str(data)
+        assert response.status_code == 500
+        assert "Authentication service unavailable" in response.text
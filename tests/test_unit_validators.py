@@ -4,6 +4,7 @@ Unit tests for validator functions in app.core.validators and app.db.validators.
 Tests cover:
 - validate_uuid
 - validate_uuid_string (app.db.validators)
+- validate_condition_tree_limits
 - validate_condition_tree_depth
 - validate_condition_tree_node_count
 - ConditionTreeValidator class
@@ -16,73 +17,126 @@ import pytest
 
 from app.core.validators import (
     validate_condition_tree_depth,
+    validate_condition_tree_limits,
     validate_condition_tree_node_count,
     validate_uuid,
 )
 from app.db.validators import validate_uuid_string
 
+_VALID_UUID = "01912345-1234-1234-1234-123456789abc"
+_UUID7_SAMPLE = uuid.uuid7()
 
-class TestValidateUUID:
-    """Tests for validate_uuid function."""
+# Shared leaf node; the validators only read trees, so it is never copied
+_AMOUNT_LEAF = {"type": "CONDITION", "field": "amount", "operator": "GT", "value": 100}
 
-    @pytest.mark.anyio
-    async def test_valid_uuid_accepted(self):
-        """Test that valid UUID format is accepted."""
-        uuid_value = "01912345-1234-1234-1234-123456789abc"
-        result = validate_uuid(uuid_value)
-        assert result == uuid_value
-
-    @pytest.mark.anyio
-    async def test_valid_uuid_lowercase_accepted(self):
-        """Test that lowercase UUID is accepted."""
-        uuid_value = "01912345-1234-1234-1234-123456789abc"
-        result = validate_uuid(uuid_value.lower())
-        assert result == uuid_value.lower()
-
-    @pytest.mark.anyio
-    async def test_invalid_uuid_too_short(self):
-        """Test that UUID too short is rejected."""
-        with pytest.raises(ValueError, match="must be a valid UUID format"):
-            validate_uuid("01912345-1234")
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_too_long(self):
-        """Test that UUID with extra characters is rejected."""
-        with pytest.raises(ValueError, match="must be a valid UUID format"):
-            validate_uuid("01912345-1234-1234-1234-123456789abc-extra")
+def _leaf(field: str, value: int) -> dict:
+    return {"type": "CONDITION", "field": field, "operator": "EQ", "value": value}
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_missing_hyphens(self):
-        """Test that UUID without hyphens is rejected."""
-        with pytest.raises(ValueError, match="must be a valid UUID format"):
-            validate_uuid("01912345123412341234123456789abc")
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_not_string(self):
-        """Test that non-string UUID is rejected."""
-        with pytest.raises(ValueError, match="must be a string"):
-            validate_uuid(12345)
+def _not_chain(levels: int) -> dict:
+    """``levels`` nested NOT nodes over one leaf (leaf at depth ``levels``)."""
+    node = _leaf("chain", 0)
+    for _ in range(levels):
+        node = {"type": "NOT", "conditions": [node]}
+    return node
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_none(self):
-        """Test that None UUID is rejected."""
-        with pytest.raises(ValueError, match="must be a string"):
-            validate_uuid(None)
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_empty_string(self):
-        """Test that empty string UUID is rejected."""
-        with pytest.raises(ValueError, match="must be a valid UUID format"):
-            validate_uuid("")
+def _flat_and(width: int) -> dict:
+    """AND node over ``width`` distinct leaves (``width + 1`` nodes)."""
+    return {
+        "type": "LOGICAL",
+        "operator": "AND",
+        "conditions": [_leaf(f"field_{i}", i) for i in range(width)],
+    }
+
+
+# Larger trees are built once per module; the validators never mutate them.
+@pytest.fixture(scope="module")
+def wide_1000_tree() -> dict:
+    """Root plus 1000 leaves (1001 nodes)."""
+    return _flat_and(1000)
+
+
+@pytest.fixture(scope="module")
+def branched_111_tree() -> dict:
+    """Root plus 10 OR branches of 10 leaves each (111 nodes)."""
+    return {
+        "type": "LOGICAL",
+        "operator": "AND",
+        "conditions": [
+            {
+                "type": "LOGICAL",
+                "operator": "OR",
+                "conditions": [_leaf(f"field_{i}_{j}", j) for j in range(10)],
+            }
+            for i in range(10)
+        ],
+    }
+
+
+@pytest.fixture(scope="module")
+def mixed_depth_width_tree() -> dict:
+    """Root over a 50-leaf wide branch and a 50-level deep chain (102 nodes)."""
+    deep_condition = _leaf("deep_0", 0)
+    for _ in range(1, 50):
+        deep_condition = {"type": "LOGICAL", "operator": "AND", "conditions": [deep_condition]}
+
+    return {
+        "type": "LOGICAL",
+        "operator": "AND",
+        "conditions": [
+            {
+                "type": "LOGICAL",
+                "operator": "AND",
+                "conditions": [_leaf(f"wide_{i}", i) for i in range(50)],
+            },
+            deep_condition,
+        ],
+    }
+
+
+class TestValidateUUID:
+    """Tests for validate_uuid function."""
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_special_chars(self):
-        """Test that UUID with special characters is rejected."""
+    @pytest.mark.parametrize(
+        "value", [_VALID_UUID, _VALID_UUID.upper()], ids=["lowercase", "uppercase"]
+    )
+    def test_valid_uuid_accepted(self, value):
+        """Test that valid UUID format is accepted."""
+        assert validate_uuid(value) == value
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "01912345-1234",
+            f"{_VALID_UUID}-extra",
+            "01912345123412341234123456789abc",
+            "",
+            "01912345-1234-1234-1234-123456789ab@",
+            f"{_VALID_UUID}\n",
+        ],
+        ids=[
+            "too_short",
+            "too_long",
+            "missing_hyphens",
+            "empty",
+            "special_chars",
+            "trailing_newline",
+        ],
+    )
+    def test_invalid_uuid_format_rejected(self, value):
+        """Test that malformed UUID strings are rejected."""
         with pytest.raises(ValueError, match="must be a valid UUID format"):
-            validate_uuid("01912345-1234-1234-1234-123456789ab@")
+            validate_uuid(value)
+
+    @pytest.mark.parametrize("value", [12345, None], ids=["int", "none"])
+    def test_invalid_uuid_not_string(self, value):
+        """Test that non-string UUID is rejected."""
+        with pytest.raises(ValueError, match="must be a string"):
+            validate_uuid(value)
 
-    @pytest.mark.anyio
-    async def test_validate_uuid_with_custom_field_name(self):
+    def test_validate_uuid_with_custom_field_name(self):
         """Test that custom field name is used in error message."""
         with pytest.raises(ValueError, match="rule_id must be a valid UUID format"):
             validate_uuid("invalid", field_name="rule_id")
@@ -91,32 +145,20 @@ class TestValidateUUID:
 class TestValidateConditionTreeDepth:
     """Tests for validate_condition_tree_depth function."""
 
-    @pytest.mark.anyio
-    async def test_should_accept_simple_condition(self):
+    def test_should_accept_simple_condition(self):
         """Test that a simple condition node passes depth validation."""
-        condition = {
-            "type": "CONDITION",
-            "field": "amount",
-            "operator": "GT",
-            "value": 100,
-        }
+        condition = _AMOUNT_LEAF
 
         # Should not raise any exception
         validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_accept_shallow_logical_tree(self):
+    def test_should_accept_shallow_logical_tree(self):
         """Test that a shallow logical tree passes depth validation."""
         condition = {
             "type": "LOGICAL",
             "operator": "AND",
             "conditions": [
-                {
-                    "type": "CONDITION",
-                    "field": "amount",
-                    "operator": "GT",
-                    "value": 100,
-                },
+                _AMOUNT_LEAF,
                 {
                     "type": "CONDITION",
                     "field": "country",
@@ -129,11 +171,10 @@ class TestValidateConditionTreeDepth:
         # Should not raise any exception
         validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_accept_tree_at_max_depth(self):
+    def test_should_accept_tree_at_max_depth(self):
         """Test that a tree exactly at max depth passes validation."""
         # Build a tree with exactly 10 levels (depth 0 to 9)
-        condition = {"type": "CONDITION", "field": "amount", "operator": "GT", "value": 100}
+        condition = _AMOUNT_LEAF
 
         for _ in range(9):
             condition = {
@@ -145,11 +186,10 @@ class TestValidateConditionTreeDepth:
         # Should not raise any exception (depth 9 is OK for max_depth=10)
         validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_reject_tree_exceeding_max_depth(self):
+    def test_should_reject_tree_exceeding_max_depth(self):
         """Test that a tree exceeding max depth fails validation."""
         # Build a tree with 12 levels (depth 0 to 11)
-        condition = {"type": "CONDITION", "field": "amount", "operator": "GT", "value": 100}
+        condition = _AMOUNT_LEAF
 
         for _ in range(11):
             condition = {
@@ -162,8 +202,7 @@ class TestValidateConditionTreeDepth:
         with pytest.raises(ValueError, match="Condition tree exceeds maximum depth of 10"):
             validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_accept_custom_max_depth(self):
+    def test_should_accept_custom_max_depth(self):
         """Test that custom max_depth parameter is respected."""
         condition = {
             "type": "LOGICAL",
@@ -172,9 +211,7 @@ class TestValidateConditionTreeDepth:
                 {
                     "type": "LOGICAL",
                     "operator": "AND",
-                    "conditions": [
-                        {"type": "CONDITION", "field": "amount", "operator": "GT", "value": 100}
-                    ],
+                    "conditions": [_AMOUNT_LEAF],
                 }
             ],
         }
@@ -186,8 +223,7 @@ class TestValidateConditionTreeDepth:
         with pytest.raises(ValueError, match="Condition tree exceeds maximum depth of 1"):
             validate_condition_tree_depth(condition, max_depth=1)
 
-    @pytest.mark.anyio
-    async def test_should_handle_empty_logical_node(self):
+    def test_should_handle_empty_logical_node(self):
         """Test that a logical node with no conditions is handled correctly."""
         condition = {"type": "LOGICAL", "operator": "AND", "conditions": []}
 
@@ -198,32 +234,20 @@ class TestValidateConditionTreeDepth:
 class TestValidateConditionTreeNodeCount:
     """Tests for validate_condition_tree_node_count function."""
 
-    @pytest.mark.anyio
-    async def test_should_count_single_node(self):
+    def test_should_count_single_node(self):
         """Test that a single condition node is counted correctly."""
-        condition = {
-            "type": "CONDITION",
-            "field": "amount",
-            "operator": "GT",
-            "value": 100,
-        }
+        condition = _AMOUNT_LEAF
 
         # Should not raise any exception (1 node <= 1000)
         validate_condition_tree_node_count(condition, max_nodes=1000)
 
-    @pytest.mark.anyio
-    async def test_should_count_logical_node_with_children(self):
+    def test_should_count_logical_node_with_children(self):
         """Test that logical node and children are all counted."""
         condition = {
             "type": "LOGICAL",
             "operator": "AND",
             "conditions": [
-                {
-                    "type": "CONDITION",
-                    "field": "amount",
-                    "operator": "GT",
-                    "value": 100,
-                },
+                _AMOUNT_LEAF,
                 {
                     "type": "CONDITION",
                     "field": "country",
@@ -236,115 +260,27 @@ class TestValidateConditionTreeNodeCount:
         # Should not raise any exception (3 nodes: 1 logical + 2 conditions)
         validate_condition_tree_node_count(condition, max_nodes=1000)
 
-    @pytest.mark.anyio
-    async def test_should_count_deep_tree_correctly(self):
+    def test_should_count_deep_tree_correctly(self, branched_111_tree):
         """Test that node counting works correctly for deep trees."""
-        # Create a tree with 100 nodes (10 branches of 10 nodes each)
-        conditions = []
-        for i in range(10):
-            branch = {
-                "type": "LOGICAL",
-                "operator": "OR",
-                "conditions": [],
-            }
-            for j in range(9):
-                branch["conditions"].append(
-                    {
-                        "type": "CONDITION",
-                        "field": f"field_{i}_{j}",
-                        "operator": "EQ",
-                        "value": j,
-                    }
-                )
-            # Add one more level
-            branch["conditions"].append(
-                {
-                    "type": "CONDITION",
-                    "field": f"field_{i}_9",
-                    "operator": "EQ",
-                    "value": 9,
-                }
-            )
-            conditions.append(branch)
-
-        condition = {
-            "type": "LOGICAL",
-            "operator": "AND",
-            "conditions": conditions,
-        }
-
         # Should not raise any exception (111 nodes: 1 root + 10 branches + 100 conditions)
-        validate_condition_tree_node_count(condition, max_nodes=1000)
+        validate_condition_tree_node_count(branched_111_tree, max_nodes=1000)
 
-    @pytest.mark.anyio
-    async def test_should_reject_tree_exceeding_max_nodes(self):
+    def test_should_reject_tree_exceeding_max_nodes(self, wide_1000_tree):
         """Test that a tree with too many nodes fails validation."""
-        # Create a tree with 1001 nodes (exceeds default max of 1000)
-        conditions = []
-        for i in range(1000):
-            conditions.append(
-                {
-                    "type": "CONDITION",
-                    "field": f"field_{i}",
-                    "operator": "EQ",
-                    "value": i,
-                }
-            )
-
-        condition = {
-            "type": "LOGICAL",
-            "operator": "AND",
-            "conditions": conditions,
-        }
-
-        # Should raise ValueError (1001 nodes exceeds 1000)
+        # Should raise ValueError (1001 nodes exceeds default max of 1000)
         with pytest.raises(ValueError, match="Condition tree exceeds maximum node count of 1000"):
-            validate_condition_tree_node_count(condition, max_nodes=1000)
+            validate_condition_tree_node_count(wide_1000_tree, max_nodes=1000)
 
-    @pytest.mark.anyio
-    async def test_should_accept_tree_at_exactly_max_nodes(self):
+    def test_should_accept_tree_at_exactly_max_nodes(self):
         """Test that a tree with exactly max_nodes passes validation."""
-        # Create a tree with exactly 100 nodes
-        conditions = []
-        for i in range(99):
-            conditions.append(
-                {
-                    "type": "CONDITION",
-                    "field": f"field_{i}",
-                    "operator": "EQ",
-                    "value": i,
-                }
-            )
-
-        condition = {
-            "type": "LOGICAL",
-            "operator": "AND",
-            "conditions": conditions,
-        }
+        condition = _flat_and(99)  # exactly 100 nodes
 
         # Should not raise any exception (100 nodes == max_nodes=100)
         validate_condition_tree_node_count(condition, max_nodes=100)
 
-    @pytest.mark.anyio
-    async def test_should_respect_custom_max_nodes(self):
+    def test_should_respect_custom_max_nodes(self):
         """Test that custom max_nodes parameter is respected."""
-        # Create a tree with 50 nodes
-        conditions = []
-        for i in range(49):
-            conditions.append(
-                {
-                    "type": "CONDITION",
-                    "field": f"field_{i}",
-                    "operator": "EQ",
-                    "value": i,
-                }
-            )
-
-        condition = {
-            "type": "LOGICAL",
-            "operator": "AND",
-            "conditions": conditions,
-        }
+        condition = _flat_and(49)  # 50 nodes
 
         # Should pass with max_nodes=100
         validate_condition_tree_node_count(condition, max_nodes=100)
@@ -353,8 +289,7 @@ class TestValidateConditionTreeNodeCount:
         with pytest.raises(ValueError, match="Condition tree exceeds maximum node count of 10"):
             validate_condition_tree_node_count(condition, max_nodes=10)
 
-    @pytest.mark.anyio
-    async def test_should_count_complex_nested_tree(self):
+    def test_should_count_complex_nested_tree(self):
         """Test node counting for a complex nested tree structure."""
         condition = {
             "type": "LOGICAL",
@@ -364,12 +299,7 @@ class TestValidateConditionTreeNodeCount:
                     "type": "LOGICAL",
                     "operator": "OR",
                     "conditions": [
-                        {
-                            "type": "CONDITION",
-                            "field": "amount",
-                            "operator": "GT",
-                            "value": 100,
-                        },
+                        _AMOUNT_LEAF,
                         {
                             "type": "CONDITION",
                             "field": "amount",
@@ -406,78 +336,29 @@ class TestValidateConditionTreeNodeCount:
         with pytest.raises(ValueError, match="Condition tree exceeds maximum node count of 5"):
             validate_condition_tree_node_count(condition, max_nodes=5)
 
-    @pytest.mark.anyio
-    async def test_should_include_error_message_with_actual_count(self):
+    def test_should_include_error_message_with_actual_count(self):
         """Test that error message includes actual node count."""
-        # Create a tree with 105 nodes
-        conditions = []
-        for i in range(104):
-            conditions.append(
-                {
-                    "type": "CONDITION",
-                    "field": f"field_{i}",
-                    "operator": "EQ",
-                    "value": i,
-                }
-            )
-
-        condition = {
-            "type": "LOGICAL",
-            "operator": "AND",
-            "conditions": conditions,
-        }
+        condition = _flat_and(104)  # 105 nodes
 
-        # Should raise ValueError with specific count in message
-        with pytest.raises(ValueError, match=r"got 105 nodes"):
+        # Counting stops once the root's 104 children are queued (1 + 104 > 100)
+        with pytest.raises(ValueError, match=r"got 105\+ nodes"):
             validate_condition_tree_node_count(condition, max_nodes=100)
 
-    @pytest.mark.anyio
-    async def test_should_handle_mixed_depth_and_width(self):
+    def test_should_handle_mixed_depth_and_width(self, mixed_depth_width_tree):
         """Test node counting for trees with varying depth and width."""
-        # Create a tree that's wide but shallow
-        wide_conditions = []
-        for i in range(50):
-            wide_conditions.append(
-                {
-                    "type": "CONDITION",
-                    "field": f"wide_{i}",
-                    "operator": "EQ",
-                    "value": i,
-                }
-            )
-
-        # Create a tree that's narrow but deep
-        deep_condition = {"type": "CONDITION", "field": "deep_0", "operator": "EQ", "value": 0}
-        for _i in range(1, 50):
-            deep_condition = {
-                "type": "LOGICAL",
-                "operator": "AND",
-                "conditions": [deep_condition],
-            }
-
-        # Combine both
-        condition = {
-            "type": "LOGICAL",
-            "operator": "AND",
-            "conditions": [
-                {"type": "LOGICAL", "operator": "AND", "conditions": wide_conditions},
-                deep_condition,
-            ],
-        }
-
-        # Total: 1 root + (1 logical + 50 wide leaves) + (49 logical + 1 deep leaf) = 102 nodes
-        with pytest.raises(ValueError, match=r"got 102 nodes"):
-            validate_condition_tree_node_count(condition, max_nodes=100)
+        # Total: 1 root + (1 logical + 50 wide leaves) + (49 logical + 1 deep leaf) = 102 nodes;
+        # the wide branch is expanded last, so counting stops exactly at the full total
+        with pytest.raises(ValueError, match=r"got 102\+ nodes"):
+            validate_condition_tree_node_count(mixed_depth_width_tree, max_nodes=100)
 
         # Should pass with max_nodes=150
-        validate_condition_tree_node_count(condition, max_nodes=150)
+        validate_condition_tree_node_count(mixed_depth_width_tree, max_nodes=150)
 
 
 class TestValidateConditionTreeDepthEdgeCases:
     """Additional edge case tests for validate_condition_tree_depth."""
 
-    @pytest.mark.anyio
-    async def test_should_handle_condition_without_type(self):
+    def test_should_handle_condition_without_type(self):
         """Test that a condition node without type field is handled."""
         # A node without type should not recurse into children
         condition = {
@@ -489,30 +370,28 @@ class TestValidateConditionTreeDepthEdgeCases:
         # Should not raise any exception
         validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_handle_or_type_with_nested_conditions(self):
+    def test_should_treat_non_string_type_as_leaf(self):
+        """Test that an unhashable type does not raise TypeError and is not walked."""
+        condition = {"type": ["AND"], "conditions": [{"type": "NOT", "conditions": []}] * 5}
+
+        validate_condition_tree_depth(condition, max_depth=0)
+        validate_condition_tree_node_count(condition, max_nodes=1)
+
+    def test_should_handle_or_type_with_nested_conditions(self):
         """Test depth validation with OR type format."""
         condition = {
             "type": "OR",
             "conditions": [
                 {
                     "type": "OR",
-                    "conditions": [
-                        {
-                            "type": "CONDITION",
-                            "field": "amount",
-                            "operator": "GT",
-                            "value": 100,
-                        }
-                    ],
+                    "conditions": [_AMOUNT_LEAF],
                 }
             ],
         }
 
         validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_handle_not_type_with_nested_conditions(self):
+    def test_should_handle_not_type_with_nested_conditions(self):
         """Test depth validation with NOT type format."""
         condition = {
             "type": "NOT",
@@ -533,8 +412,7 @@ class TestValidateConditionTreeDepthEdgeCases:
 
         validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_handle_mixed_logical_types(self):
+    def test_should_handle_mixed_logical_types(self):
         """Test depth validation with mixed LOGICAL/AND/OR/NOT types."""
         condition = {
             "type": "LOGICAL",
@@ -549,14 +427,7 @@ class TestValidateConditionTreeDepthEdgeCases:
                                 {
                                     "type": "LOGICAL",
                                     "operator": "AND",
-                                    "conditions": [
-                                        {
-                                            "type": "CONDITION",
-                                            "field": "amount",
-                                            "operator": "GT",
-                                            "value": 100,
-                                        }
-                                    ],
+                                    "conditions": [_AMOUNT_LEAF],
                                 }
                             ],
                         }
@@ -567,28 +438,16 @@ class TestValidateConditionTreeDepthEdgeCases:
 
         validate_condition_tree_depth(condition, max_depth=10)
 
-    @pytest.mark.anyio
-    async def test_should_handle_zero_max_depth(self):
+    def test_should_handle_zero_max_depth(self):
         """Test that max_depth=0 allows only root level."""
-        condition = {
-            "type": "CONDITION",
-            "field": "amount",
-            "operator": "GT",
-            "value": 100,
-        }
+        condition = _AMOUNT_LEAF
 
         # Should pass - root node is at depth 0
         validate_condition_tree_depth(condition, max_depth=0)
 
-    @pytest.mark.anyio
-    async def test_should_handle_BLOCKLIST_current_depth(self):
+    def test_should_handle_BLOCKLIST_current_depth(self):
         """Test that BLOCKLIST current_depth is handled (edge case)."""
-        condition = {
-            "type": "CONDITION",
-            "field": "amount",
-            "operator": "GT",
-            "value": 100,
-        }
+        condition = _AMOUNT_LEAF
 
         # Should not raise - depth -1 is still <= max_depth
         validate_condition_tree_depth(condition, max_depth=10, current_depth=-1)
@@ -597,13 +456,12 @@ class TestValidateConditionTreeDepthEdgeCases:
 class TestValidateConditionTreeNodeCountEdgeCases:
     """Additional edge case tests for validate_condition_tree_node_count."""
 
-    @pytest.mark.anyio
-    async def test_should_count_and_type_nodes(self):
+    def test_should_count_and_type_nodes(self):
         """Test that AND type nodes are counted correctly."""
         condition = {
             "type": "AND",
             "conditions": [
-                {"type": "CONDITION", "field": "amount", "operator": "GT", "value": 100},
+                _AMOUNT_LEAF,
                 {"type": "CONDITION", "field": "country", "operator": "EQ", "value": "US"},
             ],
         }
@@ -611,13 +469,12 @@ class TestValidateConditionTreeNodeCountEdgeCases:
         # Should count: 1 AND node + 2 condition nodes = 3 nodes
         validate_condition_tree_node_count(condition, max_nodes=10)
 
-    @pytest.mark.anyio
-    async def test_should_count_or_type_nodes(self):
+    def test_should_count_or_type_nodes(self):
         """Test that OR type nodes are counted correctly."""
         condition = {
             "type": "OR",
             "conditions": [
-                {"type": "CONDITION", "field": "amount", "operator": "GT", "value": 100},
+                _AMOUNT_LEAF,
                 {"type": "CONDITION", "field": "amount", "operator": "LT", "value": 1000},
             ],
         }
@@ -625,8 +482,7 @@ class TestValidateConditionTreeNodeCountEdgeCases:
         # Should count: 1 OR node + 2 condition nodes = 3 nodes
         validate_condition_tree_node_count(condition, max_nodes=10)
 
-    @pytest.mark.anyio
-    async def test_should_count_not_type_nodes(self):
+    def test_should_count_not_type_nodes(self):
         """Test that NOT type nodes are counted correctly."""
         condition = {
             "type": "NOT",
@@ -638,8 +494,7 @@ class TestValidateConditionTreeNodeCountEdgeCases:
         # Should count: 1 NOT node + 1 condition node = 2 nodes
         validate_condition_tree_node_count(condition, max_nodes=10)
 
-    @pytest.mark.anyio
-    async def test_should_count_mixed_type_nodes(self):
+    def test_should_count_mixed_type_nodes(self):
         """Test node counting with mixed LOGICAL/AND/OR/NOT types."""
         condition = {
             "type": "LOGICAL",
@@ -653,14 +508,7 @@ class TestValidateConditionTreeNodeCountEdgeCases:
                             "conditions": [
                                 {
                                     "type": "AND",
-                                    "conditions": [
-                                        {
-                                            "type": "CONDITION",
-                                            "field": "amount",
-                                            "operator": "GT",
-                                            "value": 100,
-                                        }
-                                    ],
+                                    "conditions": [_AMOUNT_LEAF],
                                 }
                             ],
                         }
@@ -672,8 +520,7 @@ class TestValidateConditionTreeNodeCountEdgeCases:
         # Should count: 1 LOGICAL + 1 OR + 1 NOT + 1 AND + 1 CONDITION = 5 nodes
         validate_condition_tree_node_count(condition, max_nodes=10)
 
-    @pytest.mark.anyio
-    async def test_should_handle_node_without_type(self):
+    def test_should_handle_node_without_type(self):
         """Test that a node without type field is counted as single node."""
         condition = {
             "field": "amount",
@@ -684,8 +531,7 @@ class TestValidateConditionTreeNodeCountEdgeCases:
         # Should count as 1 node (no children to recurse into)
         validate_condition_tree_node_count(condition, max_nodes=10)
 
-    @pytest.mark.anyio
-    async def test_should_handle_complex_mixed_tree(self):
+    def test_should_handle_complex_mixed_tree(self):
         """Test node counting for a complex tree with all types."""
         condition = {
             "type": "AND",
@@ -715,121 +561,104 @@ class TestValidateConditionTreeNodeCountEdgeCases:
             validate_condition_tree_node_count(condition, max_nodes=5)
 
 
-class TestValidateUUIDString:
-    """Tests for validate_uuid_string function in app.db.validators.
+class TestValidateConditionTreeLimits:
+    """Tests for validate_condition_tree_limits with both limits active."""
 
-    This validator is used with SQLAlchemy's @validates decorator
-    to ensure UUID fields are consistently stored as valid UUID strings.
-    """
+    def test_should_accept_tree_within_both_limits(self, branched_111_tree):
+        """Test that a tree at exactly both limits is accepted."""
+        validate_condition_tree_limits(branched_111_tree, max_depth=2, max_nodes=111)
 
-    @pytest.mark.anyio
-    async def test_valid_uuid_string_accepted(self):
-        """Test that valid UUID string format is accepted."""
-        uuid_value = "01912345-1234-1234-1234-123456789abc"
-        result = validate_uuid_string("test_field", uuid_value)
-        assert result == uuid_value
-
-    @pytest.mark.anyio
-    async def test_valid_uuid7_object_accepted(self):
-        """Test that UUID7 object is converted to string."""
-        uuid7_value = uuid.uuid7()
-        result = validate_uuid_string("test_field", uuid7_value)
-        assert result == str(uuid7_value)
-        assert uuid7_value.version == 7
-
-    @pytest.mark.anyio
-    async def test_valid_uuid4_object_accepted(self):
-        """Test that UUID4 object is converted to string."""
-        uuid4_value = uuid.uuid4()
-        result = validate_uuid_string("test_field", uuid4_value)
-        assert result == str(uuid4_value)
-
-    @pytest.mark.anyio
-    async def test_valid_uuid_string_lowercase_accepted(self):
-        """Test that lowercase UUID string is accepted."""
-        uuid_value = "01912345-1234-1234-1234-123456789abc"
-        result = validate_uuid_string("test_field", uuid_value.lower())
-        assert result == uuid_value.lower()
-
-    @pytest.mark.anyio
-    async def test_valid_uuid_string_uppercase_accepted(self):
-        """Test that uppercase UUID string is accepted."""
-        uuid_value = "01912345-1234-1234-1234-123456789ABC"
-        result = validate_uuid_string("test_field", uuid_value)
-        assert result == uuid_value
-
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_too_short(self):
-        """Test that UUID string too short is rejected."""
-        with pytest.raises(ValueError, match="Invalid UUID format"):
-            validate_uuid_string("test_field", "01912345-1234")
+    def test_should_reject_depth_within_node_limit(self):
+        """Test that depth is enforced when the node count is fine."""
+        with pytest.raises(ValueError, match="exceeds maximum depth of 3"):
+            validate_condition_tree_limits(_not_chain(4), max_depth=3, max_nodes=1000)
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_too_long(self):
-        """Test that UUID string with extra characters is rejected."""
-        with pytest.raises(ValueError, match="Invalid UUID format"):
-            validate_uuid_string("test_field", "01912345-1234-1234-1234-123456789abc-extra")
+    def test_should_reject_node_count_within_depth_limit(self, wide_1000_tree):
+        """Test that node count is enforced when the depth is fine."""
+        with pytest.raises(ValueError, match="maximum node count of 1000"):
+            validate_condition_tree_limits(wide_1000_tree, max_depth=10, max_nodes=1000)
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_missing_hyphens(self):
-        """Test that UUID string without hyphens is accepted (Python's UUID parser accepts it)."""
-        uuid_value = "01912345123412341234123456789abc"
-        result = validate_uuid_string("test_field", uuid_value)
-        assert result == uuid_value
+    def test_should_report_first_violation_in_walk_order(self):
+        """Test which error wins when a tree breaks both limits.
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_not_string(self):
-        """Test that non-string UUID is rejected."""
-        with pytest.raises(ValueError, match="Expected UUID or str"):
-            validate_uuid_string("test_field", 12345)
+        Children are expanded last-first, and a parent's children are counted
+        before any of them is visited.
+        """
+        wide = {"type": "OR", "conditions": [_leaf(f"wide_{i}", i) for i in range(20)]}
+        deep = _not_chain(5)
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_none(self):
-        """Test that None UUID is rejected."""
-        with pytest.raises(ValueError, match="Expected UUID or str"):
-            validate_uuid_string("test_field", None)
+        # The wide branch is expanded first and overflows the node count
+        with pytest.raises(ValueError, match=r"maximum node count of 10 \(got 23\+ nodes\)"):
+            validate_condition_tree_limits(
+                {"type": "AND", "conditions": [deep, wide]}, max_depth=3, max_nodes=10
+            )
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_empty(self):
-        """Test that empty string UUID is rejected."""
-        with pytest.raises(ValueError, match="Invalid UUID format"):
-            validate_uuid_string("test_field", "")
+        # The deep chain is walked first and hits the depth limit
+        with pytest.raises(ValueError, match="exceeds maximum depth of 3"):
+            validate_condition_tree_limits(
+                {"type": "AND", "conditions": [wide, deep]}, max_depth=3, max_nodes=10
+            )
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_special_chars(self):
-        """Test that UUID string with special characters is rejected."""
-        with pytest.raises(ValueError, match="Invalid UUID format"):
-            validate_uuid_string("test_field", "01912345-1234-1234-1234-123456789ab@")
+    def test_should_count_root_children_before_checking_depth(self):
+        """Test that an oversized root fails on node count even at zero depth."""
+        with pytest.raises(ValueError, match=r"got 21\+ nodes"):
+            validate_condition_tree_limits(_flat_and(20), max_depth=0, max_nodes=10)
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_integer(self):
-        """Test that integer UUID is rejected."""
-        with pytest.raises(ValueError, match="Expected UUID or str"):
-            validate_uuid_string("test_field", 12345)
+    def test_should_offset_depth_by_current_depth(self):
+        """Test that current_depth counts against max_depth."""
+        validate_condition_tree_limits(_not_chain(2), max_depth=3, current_depth=1)
+        with pytest.raises(ValueError, match="exceeds maximum depth of 3"):
+            validate_condition_tree_limits(_not_chain(3), max_depth=3, current_depth=1)
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_float(self):
-        """Test that float UUID is rejected."""
-        with pytest.raises(ValueError, match="Expected UUID or str"):
-            validate_uuid_string("test_field", 12345.67)
 
-    @pytest.mark.anyio
-    async def test_invalid_uuid_string_list(self):
-        """Test that list UUID is rejected."""
+class TestValidateUUIDString:
+    """Tests for validate_uuid_string function in app.db.validators.
+
+    This validator is used with SQLAlchemy's @validates decorator
+    to ensure UUID fields are consistently stored as valid UUID strings.
+    """
+
+    @pytest.mark.parametrize(
+        "value",
+        [_VALID_UUID, _VALID_UUID.upper(), "01912345123412341234123456789abc"],
+        # Python's UUID parser accepts the hyphen-less form
+        ids=["lowercase", "uppercase", "missing_hyphens"],
+    )
+    def test_valid_uuid_string_accepted(self, value):
+        """Test that valid UUID strings are returned unchanged."""
+        assert validate_uuid_string("test_field", value) == value
+
+    @pytest.mark.parametrize("value", [_UUID7_SAMPLE, uuid.uuid4()], ids=["uuid7", "uuid4"])
+    def test_valid_uuid_object_accepted(self, value):
+        """Test that UUID objects are converted to string."""
+        assert validate_uuid_string("test_field", value) == str(value)
+
+    @pytest.mark.parametrize(
+        "value",
+        ["01912345-1234", f"{_VALID_UUID}-extra", "", "01912345-1234-1234-1234-123456789ab@"],
+        ids=["too_short", "too_long", "empty", "special_chars"],
+    )
+    def test_invalid_uuid_string_rejected(self, value):
+        """Test that malformed UUID strings are rejected."""
+        with pytest.raises(ValueError, match="Invalid UUID format"):
+            validate_uuid_string("test_field", value)
+
+    @pytest.mark.parametrize(
+        "value",
+        [12345, None, 12345.67, [_VALID_UUID]],
+        ids=["int", "none", "float", "list"],
+    )
+    def test_invalid_uuid_string_not_string(self, value):
+        """Test that values that are neither UUID nor str are rejected."""
         with pytest.raises(ValueError, match="Expected UUID or str"):
-            validate_uuid_string("test_field", ["01912345-1234-1234-1234-123456789abc"])
+            validate_uuid_string("test_field", value)
 
-    @pytest.mark.anyio
-    async def test_valid_uuid7_string_from_uuid7_object(self):
+    def test_valid_uuid7_string_from_uuid7_object(self):
         """Test that UUID7 object produces valid UUID7 string."""
-        uuid7_value = uuid.uuid7()
-        result = validate_uuid_string("test_field", uuid7_value)
-        parsed = uuid.UUID(result)
-        assert parsed.version == 7
+        result = validate_uuid_string("test_field", _UUID7_SAMPLE)
+        assert uuid.UUID(result).version == 7
 
-    @pytest.mark.anyio
-    async def test_key_parameter_not_used_in_output(self):
+    def test_key_parameter_not_used_in_output(self):
         """Test that _key parameter doesn't affect the output."""
-        uuid_value = "01912345-1234-1234-1234-123456789abc"
-        result = validate_uuid_string("any_field_name", uuid_value)
-        assert result == uuid_value
+        result = validate_uuid_string("any_field_name", _VALID_UUID)
+        assert result == _VALID_UUID